@@ -5,17 +5,70 @@ import os
 import sys
 import tempfile
 import shutil
-import glob
+import fnmatch
+import re
 import csv
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from pypdf import PdfReader, PdfWriter
 
-from .cropper import crop_pdf
-from .extract_zone_data import extract_zone_data
-from .make_pdf import html_to_pdf
+try:
+    # libyaml's C parser, when PyYAML was built with it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from .cropper import crop_pdf_with_crops, read_crops
+from .extract_zone_data import extract_zone_data, _canon, _read_nonempty_lines
+from .make_pdf import html_to_pdf, html_to_pdf_from_string
 from .riffle_shuffle import riffle_shuffle_pdfs
 
 
+def _default_worker_count():
+    """Default number of worker processes, leaving a couple of cores free."""
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+def _build_one_room(room, csv_data_dir, tabs_file, working_dir, custom_timestamp, csv_files=None):
+    """Build the data page PDF for a single room; returns (room_name, pdf_file).
+
+    Module-level so it can run in a worker process.
+    """
+    room_name = room['name']
+    zones = room['zones']
+
+    # Create temporary zones file for this room
+    zones_file = os.path.join(working_dir, f"zones_{room_name.replace(' ', '_')}.csv")
+    with open(zones_file, 'w') as f:
+        for zone in zones:
+            f.write(f"{zone}\n")
+
+    # Create HTML output file
+    html_file = os.path.join(working_dir, f"data_{room_name.replace(' ', '_')}.html")
+
+    html = extract_zone_data(csv_data_dir, room_name, tabs_file, zones_file, html_file, custom_timestamp, csv_files)
+
+    # Convert HTML to PDF straight from the in-memory string; the HTML file
+    # on disk is kept only for debugging
+    pdf_file = html_file.replace('.html', '.pdf')
+    if html is not None:
+        html_to_pdf_from_string(html, pdf_file, base_url=working_dir)
+    else:
+        html_to_pdf(html_file, pdf_file)
+
+    return room_name, pdf_file
+
+
 class DocumentationPackBuilder:
     def __init__(self, config_path):
         """Initialise the documentation pack builder with configuration."""
@@ -24,6 +77,10 @@ class DocumentationPackBuilder:
         self.config = self._load_config()
         self.working_dir = None
         self.plan_pdfs = {}
+        self._tabs = None
+        self._crops = None
+        self._crops_index = None
+        self._csv_files = None
 
     def _resolve_path(self, path):
         """Resolve a path relative to current working directory if not absolute."""
@@ -35,18 +92,51 @@ class DocumentationPackBuilder:
         """Get list of data tabs (for data extraction).
 
         Returns list from 'data_tabs' in config, or reads from 'tabs_file' for backward compatibility.
+        The result is cached so the tabs file is read at most once.
         """
+        if self._tabs is not None:
+            return self._tabs
+
         if 'data_tabs' in self.config:
-            return self.config['data_tabs']
+            self._tabs = self.config['data_tabs']
         else:
             # Backward compatibility: read from tabs_file
             tabs_file = self._resolve_path(self.config['tabs_file'])
             try:
-                with open(tabs_file, 'r') as f:
-                    return [line.strip() for line in f.readlines() if line.strip()]
+                self._tabs = _read_nonempty_lines(tabs_file)
             except FileNotFoundError:
                 raise FileNotFoundError(f"Tabs file not found: {tabs_file}")
 
+        return self._tabs
+
+    def _get_crops(self):
+        """Get the parsed crops CSV, reading it at most once."""
+        if self._crops is None:
+            crops_file = self._resolve_path(self.config['crops_file'])
+            self._crops = read_crops(crops_file)
+        return self._crops
+
+    def _get_crops_index(self):
+        """Get a dict mapping normalised room name to row index in the crops file.
+
+        Built once from the cached crops so room lookups are O(1) instead of
+        a linear scan per room.
+        """
+        if self._crops_index is None:
+            index = {}
+            for idx, crop in enumerate(self._get_crops()):
+                # Handle multi-line entries by normalising whitespace and Unicode quotes
+                index.setdefault(_canon(crop[0]), idx)
+            self._crops_index = index
+        return self._crops_index
+
+    def _get_csv_files(self):
+        """Get the CSV filenames in the data directory, listing it at most once."""
+        if self._csv_files is None:
+            csv_data_dir = self._resolve_path(self.config['csv_data_directory'])
+            self._csv_files = [f for f in os.listdir(csv_data_dir) if f.endswith(".csv")]
+        return self._csv_files
+
     def _get_pages(self):
         """Get list of pages (for plan PDF discovery).
 
@@ -62,7 +152,7 @@ class DocumentationPackBuilder:
         """Load and validate the YAML configuration."""
         try:
             with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=_YamlLoader)
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         except yaml.YAMLError as e:
@@ -128,15 +218,29 @@ class DocumentationPackBuilder:
         plan_dir = self._resolve_path(self.config['plan_pdfs_directory'])
         pages = self._get_pages()
 
+        # Scan the plan directory once; match each page's pattern in memory
+        # instead of issuing one glob (directory scan) per page. Skip
+        # dotfiles (e.g. macOS ._ sidecars) to keep glob's hidden-file
+        # semantics, which fnmatch alone does not have. No extension filter
+        # here: pdf_filename_pattern decides what matches (it need not end
+        # in lowercase .pdf).
+        pdf_names = [e.name for e in os.scandir(plan_dir)
+                     if not e.name.startswith('.')]
+
         # Find matching PDFs for each page
         pdf_pattern = self.config.get('pdf_filename_pattern', '*{tab}*.pdf')
+        compiled_patterns = {}
 
         for page in pages:
             # Replace {tab} placeholder with actual page name
             search_pattern = pdf_pattern.replace('{tab}', page)
-            search_path = os.path.join(plan_dir, search_pattern)
 
-            matching_files = glob.glob(search_path)
+            matcher = compiled_patterns.get(search_pattern)
+            if matcher is None:
+                matcher = re.compile(fnmatch.translate(search_pattern)).match
+                compiled_patterns[search_pattern] = matcher
+
+            matching_files = [os.path.join(plan_dir, name) for name in pdf_names if matcher(name)]
 
             if len(matching_files) == 0:
                 raise FileNotFoundError(f"No PDF files found for page '{page}' using pattern: {search_pattern}")
@@ -146,20 +250,31 @@ class DocumentationPackBuilder:
                 self.plan_pdfs[page] = matching_files[0]
                 print(f"Found PDF for '{page}': {os.path.basename(matching_files[0])}")
 
-    def _create_cropped_plans(self):
+    def _create_cropped_plans(self, jobs=None):
         """Create cropped plan pages for each tab using cropper utility."""
-        crops_file = self._resolve_path(self.config['crops_file'])
         cropped_files = {}
 
-        for tab, pdf_path in self.plan_pdfs.items():
-            output_path = os.path.join(self.working_dir, f"cropped_{tab.replace(' ', '_')}.pdf")
-
-            try:
-                crop_pdf(pdf_path, output_path, crops_file)
+        # The crops CSV is parsed once (and cached) in the parent; the parsed
+        # list is passed to workers. Each tab reads a different source PDF and
+        # writes its own output file, so tabs can be cropped in parallel.
+        crops = self._get_crops()
+        max_workers = jobs if jobs else _default_worker_count()
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for tab, pdf_path in self.plan_pdfs.items():
+                output_path = os.path.join(self.working_dir, f"cropped_{tab.replace(' ', '_')}.pdf")
+                future = executor.submit(crop_pdf_with_crops, pdf_path, output_path, crops)
+                futures[future] = (tab, output_path)
+
+            for future in as_completed(futures):
+                tab, output_path = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Error cropping PDF for '{tab}': {e}")
                 cropped_files[tab] = output_path
                 print(f"Created cropped plans for '{tab}': {os.path.basename(output_path)}")
-            except Exception as e:
-                raise RuntimeError(f"Error cropping PDF for '{tab}': {e}")
 
         return cropped_files
 
@@ -181,8 +296,8 @@ class DocumentationPackBuilder:
         except Exception as e:
             raise RuntimeError(f"Error shuffling plans: {e}")
 
-    def _create_room_data_pages(self, custom_timestamp=None):
-        """Create data pages for each room."""
+    def _create_room_data_pages(self, custom_timestamp=None, jobs=None):
+        """Create data pages for each room, one worker process per room."""
         csv_data_dir = self._resolve_path(self.config['csv_data_directory'])
         data_tabs = self._get_data_tabs()
 
@@ -194,33 +309,72 @@ class DocumentationPackBuilder:
 
         room_data_files = {}
 
-        for room in self.config['rooms']:
-            room_name = room['name']
-            zones = room['zones']
+        # Each room writes to room-unique filenames in the shared working
+        # directory, so rooms can be built in parallel.
+        max_workers = jobs if jobs else _default_worker_count()
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    _build_one_room, room, csv_data_dir, tabs_file,
+                    self.working_dir, custom_timestamp, self._get_csv_files()
+                ): room['name']
+                for room in self.config['rooms']
+            }
+
+            for future in as_completed(futures):
+                room_name = futures[future]
+                try:
+                    room_name, pdf_file = future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Error creating data page for '{room_name}': {e}")
+                room_data_files[room_name] = pdf_file
+                print(f"Created data page for '{room_name}': {os.path.basename(pdf_file)}")
 
-            # Create temporary zones file for this room
-            zones_file = os.path.join(self.working_dir, f"zones_{room_name.replace(' ', '_')}.csv")
-            with open(zones_file, 'w') as f:
-                for zone in zones:
-                    f.write(f"{zone}\n")
+        return room_data_files
 
-            # Create HTML output file
-            html_file = os.path.join(self.working_dir, f"data_{room_name.replace(' ', '_')}.html")
+    def _confirm_proceed(self, auto_yes):
+        """Ask whether to proceed after warnings were printed.
 
-            try:
-                extract_zone_data(csv_data_dir, room_name, tabs_file, zones_file, html_file, custom_timestamp)
+        Auto-approves when --auto-yes is set or when stdin is not a terminal
+        (batch/CI runs), so builds never block waiting for input.
+        """
+        if auto_yes:
+            print("Proceeding automatically (--auto-yes specified)")
+            return True
 
-                # Convert HTML to PDF
-                pdf_file = html_file.replace('.html', '.pdf')
-                html_to_pdf(html_file, pdf_file)
+        if not sys.stdin.isatty():
+            print("Proceeding automatically (stdin is not a terminal)")
+            return True
 
-                room_data_files[room_name] = pdf_file
-                print(f"Created data page for '{room_name}': {os.path.basename(pdf_file)}")
+        while True:
+            response = input("Proceed with output? (Y/N): ").strip().upper()
+            if response in ['Y', 'YES']:
+                return True
+            elif response in ['N', 'NO']:
+                return False
+            else:
+                print("Please answer Y or N")
 
-            except Exception as e:
-                raise RuntimeError(f"Error creating data page for '{room_name}': {e}")
+    def _zones_in_csv(self, csv_path):
+        """Get the normalised zone names in a CSV's Location column.
 
-        return room_data_files
+        Uses pandas' C parser to read just the Location column when pandas is
+        available; otherwise falls back to a plain csv.reader pass.
+        """
+        if pd is not None:
+            col = pd.read_csv(csv_path, usecols=[1], dtype=str, na_filter=False).iloc[:, 0]
+            return {_canon(v) for v in col if v.strip()}
+
+        zones = set()
+        with open(csv_path, 'r') as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None)  # Skip header
+            for row in reader:
+                if row and len(row) > 1 and row[1].strip():  # Check Location column
+                    # Normalise zone names from CSV
+                    zones.add(_canon(row[1]))
+        return zones
 
     def _check_missing_zones(self, auto_yes=False):
         """Check for zones that don't have any data in the CSV files."""
@@ -232,32 +386,21 @@ class DocumentationPackBuilder:
         for room in self.config['rooms']:
             for zone in room['zones']:
                 # Normalise zone names to match CSV normalization
-                zone_name = ' '.join(zone.split()).strip()
-                zone_name = zone_name.replace('\u2019', "'").replace('\u201c', '"').replace('\u201d', '"')
-                all_zones.add(zone_name)
+                all_zones.add(_canon(zone))
 
         # Get all zones that have data in CSV files
         zones_with_data = set()
 
-        # Check each CSV file for zones with data
+        # Check each CSV file for zones with data (directory listed once)
+        csv_files = self._get_csv_files()
+
         for tab in data_tabs:
-            matching_files = [
-                f for f in os.listdir(csv_data_dir) if f.startswith(tab) and f.endswith(".csv")
-            ]
+            matching_files = [f for f in csv_files if f.startswith(tab)]
 
             if len(matching_files) == 1:
                 csv_path = os.path.join(csv_data_dir, matching_files[0])
                 try:
-                    with open(csv_path, 'r') as csvfile:
-                        reader = csv.reader(csvfile)
-                        for i, row in enumerate(reader):
-                            if i == 0:  # Skip header
-                                continue
-                            if row and len(row) > 1 and row[1].strip():  # Check Location column
-                                # Normalise zone names from CSV
-                                zone_name = ' '.join(row[1].split()).strip()
-                                zone_name = zone_name.replace('\u2019', "'").replace('\u201c', '"').replace('\u201d', '"')
-                                zones_with_data.add(zone_name)
+                    zones_with_data.update(self._zones_in_csv(csv_path))
                 except Exception as e:
                     print(f"Warning: Could not read {csv_path}: {e}")
 
@@ -269,43 +412,20 @@ class DocumentationPackBuilder:
             for zone in sorted(missing_zones):
                 print(f'No data for zone "{zone}"')
 
-            if auto_yes:
-                print("Proceeding automatically (--auto-yes specified)")
-                return True
-            else:
-                while True:
-                    response = input("Proceed with output? (Y/N): ").strip().upper()
-                    if response in ['Y', 'YES']:
-                        return True
-                    elif response in ['N', 'NO']:
-                        return False
-                    else:
-                        print("Please answer Y or N")
+            return self._confirm_proceed(auto_yes)
 
         return True
 
     def _check_missing_plan_pages(self, auto_yes=False):
         """Check for rooms that don't have plan pages (not in crops file)."""
-        crops_file = self._resolve_path(self.config['crops_file'])
-
         # Get all room names from config
         config_rooms = set()
         for room in self.config['rooms']:
             # Normalise config room names to match crops normalization
-            room_name = ' '.join(room['name'].split()).strip()
-            room_name = room_name.replace('\u2019', "'").replace('\u201c', '"').replace('\u201d', '"')
-            config_rooms.add(room_name)
-
-        # Get all room names from crops file
-        crops_rooms = set()
-        with open(crops_file, 'r') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if row and len(row) > 0:
-                    # Normalise room name like we do elsewhere
-                    crop_name = ' '.join(row[0].split()).strip()
-                    crop_name = crop_name.replace('\u2019', "'").replace('\u201c', '"').replace('\u201d', '"')
-                    crops_rooms.add(crop_name)
+            config_rooms.add(_canon(room['name']))
+
+        # Get all room names from crops file (already normalised in the index)
+        crops_rooms = set(self._get_crops_index())
 
         # Find rooms with missing plan pages
         missing_plan_rooms = config_rooms - crops_rooms
@@ -315,43 +435,79 @@ class DocumentationPackBuilder:
             for room in sorted(missing_plan_rooms):
                 print(f'No plan pages for room "{room}" (not found in crops file)')
 
-            if auto_yes:
-                print("Proceeding automatically (--auto-yes specified)")
-                return True
-            else:
-                while True:
-                    response = input("Proceed with output? (Y/N): ").strip().upper()
-                    if response in ['Y', 'YES']:
-                        return True
-                    elif response in ['N', 'NO']:
-                        return False
-                    else:
-                        print("Please answer Y or N")
+            return self._confirm_proceed(auto_yes)
 
         return True
 
-    def _get_crop_position(self, room_name):
-        """Find the position of a room in the crops file."""
-        crops_file = self._resolve_path(self.config['crops_file'])
+    def _combine_final_output(self, room_data_files, shuffled_plans_file, output_path):
+        """Combine data pages and plan pages into final output.
 
-        with open(crops_file, 'r') as f:
-            reader = csv.reader(f)
-            for idx, row in enumerate(reader):
-                if row and len(row) > 0:
-                    # Handle multi-line entries by normalising whitespace and Unicode quotes
-                    crop_name = ' '.join(row[0].split()).strip()
-                    crop_name = crop_name.replace('\u2019', "'").replace('\u201c', '"').replace('\u201d', '"')
+        Uses pikepdf (QPDF's C++ core) when available; falls back to pypdf.
+        """
+        room_slices = self._get_room_plan_slices()
 
-                    normalised_room_name = ' '.join(room_name.split()).strip()
-                    normalised_room_name = normalised_room_name.replace('\u2019', "'").replace('\u201c', '"').replace('\u201d', '"')
+        if pikepdf is not None:
+            self._combine_final_output_pikepdf(room_data_files, shuffled_plans_file, output_path, room_slices)
+        else:
+            self._combine_final_output_pypdf(room_data_files, shuffled_plans_file, output_path, room_slices)
 
-                    if crop_name == normalised_room_name:
-                        return idx
+        print(f"Final documentation pack created: {output_path}")
 
-        raise ValueError(f"Room '{room_name}' not found in crops file: {crops_file}")
+    def _get_room_plan_slices(self):
+        """Precompute each room's slice of the shuffled plans PDF.
 
-    def _combine_final_output(self, room_data_files, shuffled_plans_file, output_path):
-        """Combine data pages and plan pages into final output."""
+        Returns a dict mapping room name to (crop_position, slice); rooms not
+        present in the crops file are left out and skipped by the combiners.
+        """
+        num_pages = len(self._get_pages())
+        crops_index = self._get_crops_index()
+
+        room_slices = {}
+        for room in self.config['rooms']:
+            room_name = room['name']
+            position = crops_index.get(_canon(room_name))
+            if position is not None:
+                room_slices[room_name] = (position, slice(position * num_pages, (position + 1) * num_pages))
+
+        return room_slices
+
+    def _combine_final_output_pikepdf(self, room_data_files, shuffled_plans_file, output_path, room_slices):
+        """Combine the final output with pikepdf; page copies run in QPDF C++."""
+        pages = self._get_pages()
+        num_pages = len(pages)
+
+        with pikepdf.Pdf.new() as final_pdf:
+            with pikepdf.Pdf.open(shuffled_plans_file) as shuffled_pdf:
+                data_pdfs = []
+                try:
+                    for room in self.config['rooms']:
+                        room_name = room['name']
+
+                        # Add data pages for this room
+                        if room_name in room_data_files:
+                            data_pdf = pikepdf.Pdf.open(room_data_files[room_name])
+                            # keep source PDFs open until final save; pikepdf
+                            # copies pages by reference
+                            data_pdfs.append(data_pdf)
+                            final_pdf.pages.extend(data_pdf.pages)
+                            print(f"Added {len(data_pdf.pages)} data page(s) for '{room_name}'")
+
+                        # Add plan pages for this room
+                        if room_name in room_slices:
+                            crop_position, plan_slice = room_slices[room_name]
+                            final_pdf.pages.extend(shuffled_pdf.pages[plan_slice])
+                            print(f"Added {num_pages} plan page(s) for '{room_name}' (crop position {crop_position})")
+                        else:
+                            # Room not found in crops - this should have been caught earlier, but skip silently
+                            print(f"Skipped plan pages for '{room_name}' (not in crops file)")
+
+                    final_pdf.save(output_path)
+                finally:
+                    for data_pdf in data_pdfs:
+                        data_pdf.close()
+
+    def _combine_final_output_pypdf(self, room_data_files, shuffled_plans_file, output_path, room_slices):
+        """Combine the final output with pypdf (fallback when pikepdf is missing)."""
         # Get the number of plan pages (pages) to calculate pages per room
         pages = self._get_pages()
         num_pages = len(pages)
@@ -368,35 +524,31 @@ class DocumentationPackBuilder:
                 # Add data pages for this room
                 if room_name in room_data_files:
                     with open(room_data_files[room_name], 'rb') as data_f:
+                        # append the whole file in one call rather than
+                        # deep-copying page by page
                         data_reader = PdfReader(data_f)
-                        for page in data_reader.pages:
-                            final_writer.add_page(page)
+                        final_writer.append(data_reader)
                         print(f"Added {len(data_reader.pages)} data page(s) for '{room_name}'")
 
                 # Add plan pages for this room
-                try:
-                    crop_position = self._get_crop_position(room_name)
-                    start_page = crop_position * num_pages
+                if room_name in room_slices:
+                    crop_position, plan_slice = room_slices[room_name]
 
-                    for page_offset in range(num_pages):
-                        page_idx = start_page + page_offset
-                        if page_idx < len(shuffled_reader.pages):
-                            final_writer.add_page(shuffled_reader.pages[page_idx])
+                    # slicing the page list clamps to the document bounds
+                    page_indices = list(range(len(shuffled_reader.pages))[plan_slice])
+                    if page_indices:
+                        final_writer.append(shuffled_reader, pages=page_indices)
 
                     print(f"Added {num_pages} plan page(s) for '{room_name}' (crop position {crop_position})")
-
-                except ValueError:
+                else:
                     # Room not found in crops - this should have been caught earlier, but skip silently
                     print(f"Skipped plan pages for '{room_name}' (not in crops file)")
-                    continue
 
         # Write final output
         with open(output_path, 'wb') as output_file:
             final_writer.write(output_file)
 
-        print(f"Final documentation pack created: {output_path}")
-
-    def build(self, output_path, auto_yes=False, retain_working_dir=False, custom_timestamp=None):
+    def build(self, output_path, auto_yes=False, retain_working_dir=False, custom_timestamp=None, jobs=None):
         """Build the complete documentation pack."""
         try:
             print("Starting documentation pack build...")
@@ -410,7 +562,7 @@ class DocumentationPackBuilder:
 
             # Create cropped plans
             print("\n2. Creating cropped plan pages...")
-            cropped_files = self._create_cropped_plans()
+            cropped_files = self._create_cropped_plans(jobs)
 
             # Riffle shuffle plans
             print("\n3. Combining plan pages...")
@@ -418,7 +570,7 @@ class DocumentationPackBuilder:
 
             # Create room data pages
             print("\n4. Creating room data pages...")
-            room_data_files = self._create_room_data_pages(custom_timestamp)
+            room_data_files = self._create_room_data_pages(custom_timestamp, jobs)
 
             # Check for missing zones
             print("\n5. Checking for missing zone data...")
@@ -27,7 +27,8 @@ def build_command(args):
             output_file,
             auto_yes=args.auto_yes,
             retain_working_dir=args.debug_retain_working_directory,
-            custom_timestamp=args.set_timestamp
+            custom_timestamp=args.set_timestamp,
+            jobs=args.jobs
         )
         return 0
     except Exception as e:
@@ -70,6 +71,8 @@ def main():
                              help='Retain working directory for debugging')
     build_parser.add_argument('--set-timestamp', type=str,
                              help='Use specified timestamp string instead of current time')
+    build_parser.add_argument('--jobs', type=int,
+                             help='Maximum number of parallel worker processes (default: CPU count minus 2)')
     build_parser.set_defaults(func=build_command)
 
     # Check command
@@ -2,14 +2,12 @@ import fitz  # PyMuPDF
 import csv
 import sys
 
-def crop_pdf(input_pdf, output_pdf, crops_csv):
-    # Open the original PDF
-    doc = fitz.open(input_pdf)
-    
-    # Create a new PDF for output
-    new_pdf = fitz.open()
+def read_crops(crops_csv):
+    """Read crop definitions from a CSV file.
 
-    # Read the crop information from the CSV
+    Returns a list of (page_name, source_page_number, x1, y1, x2, y2) tuples.
+    """
+    crops = []
     with open(crops_csv, newline='') as csvfile:
         crop_reader = csv.reader(csvfile)
         for row in crop_reader:
@@ -17,23 +15,43 @@ def crop_pdf(input_pdf, output_pdf, crops_csv):
             page_name, source_page_number, x1, y1, x2, y2 = row
             source_page_number = int(source_page_number)
             x1, y1, x2, y2 = float(x1), float(y1), float(x2), float(y2)
-            
-            # Load the page
-            page = doc.load_page(source_page_number - 1)  # Page numbers are 0-indexed in PyMuPDF
+            crops.append((page_name, source_page_number, x1, y1, x2, y2))
+    return crops
+
+
+def crop_pdf_with_crops(input_pdf, output_pdf, crops):
+    """Crop a PDF using already-parsed crop definitions from read_crops()."""
+    # Open the original PDF
+    doc = fitz.open(input_pdf)
 
-            # Define the crop rectangle (left, top, right, bottom)
-            crop = fitz.Rect(x1, y1, x2, y2)
-            
-            # Set the crop rectangle for the page
-            page.set_cropbox(crop)
+    # Create a new PDF for output
+    new_pdf = fitz.open()
+
+    for page_name, source_page_number, x1, y1, x2, y2 in crops:
+        # Load the page
+        page = doc.load_page(source_page_number - 1)  # Page numbers are 0-indexed in PyMuPDF
+
+        # Define the crop rectangle (left, top, right, bottom)
+        crop = fitz.Rect(x1, y1, x2, y2)
+
+        # Set the crop rectangle for the page
+        original_cropbox = page.cropbox
+        page.set_cropbox(crop)
 
-            # Create a new page with the cropped content
-            new_page = new_pdf.new_page(width=page.rect.width, height=page.rect.height)
-            new_page.show_pdf_page(new_page.rect, doc, source_page_number - 1)
+        # Copy the cropped page across by reference; insert_pdf shares the
+        # page's resources via xref instead of re-rendering its content
+        new_pdf.insert_pdf(doc, from_page=source_page_number - 1, to_page=source_page_number - 1)
+
+        # Restore the source page's cropbox in case another crop uses the same page
+        page.set_cropbox(original_cropbox)
 
     # Save the cropped pages to the output PDF
     new_pdf.save(output_pdf)
 
+
+def crop_pdf(input_pdf, output_pdf, crops_csv):
+    crop_pdf_with_crops(input_pdf, output_pdf, read_crops(crops_csv))
+
 if __name__ == "__main__":
     # Command-line arguments: source PDF, target PDF, and CSV file
     if len(sys.argv) != 4:
@@ -2,22 +2,45 @@ import os
 import csv
 import sys
 from datetime import datetime
+from pathlib import Path
+
+
+# Smart quotes seen in the source spreadsheets, mapped to their ASCII forms
+# in a single C-level pass via str.translate.
+_QUOTE_TRANS = str.maketrans({'\u2019': "'", '\u201c': '"', '\u201d': '"'})
+
+
+def _canon(s):
+    """Canonicalise a room/zone name: collapse whitespace, straighten quotes."""
+    return ' '.join(s.split()).translate(_QUOTE_TRANS)
+
+
+def _read_nonempty_lines(path):
+    """Read a small list file in one pass, dropping blank lines."""
+    return [l.strip() for l in Path(path).read_text(encoding='utf-8').splitlines() if l.strip()]
+
+
+def extract_zone_data(directory, plan_name, tabs_list_file, zones_list_file, output_filename, custom_timestamp=None, csv_files=None):
+    # List the directory once; callers that already have a listing (e.g. the
+    # builder checking many rooms) can pass it in via csv_files
+    if csv_files is None:
+        csv_files = [f for f in os.listdir(directory) if f.endswith(".csv")]
 
-def extract_zone_data(directory, plan_name, tabs_list_file, zones_list_file, output_filename, custom_timestamp=None):
     # Read the tabs and zones list from the files
     try:
-        with open(tabs_list_file, 'r') as f:
-            tabs_list = [line.strip() for line in f.readlines()]
+        tabs_list = _read_nonempty_lines(tabs_list_file)
     except FileNotFoundError:
         print(f"Error: The file {tabs_list_file} does not exist.")
         return
 
     try:
-        with open(zones_list_file, 'r') as f:
-            zones_list = [line.strip() for line in f.readlines()]
+        zones_list = _read_nonempty_lines(zones_list_file)
     except FileNotFoundError:
         print(f"Error: The file {zones_list_file} does not exist.")
         return
+
+    # Normalise once and hash for O(1) membership in the row loop
+    zones_set = frozenset(_canon(z) for z in zones_list)
     
     # Generate timestamp for footer
     if custom_timestamp:
@@ -27,11 +50,12 @@ def extract_zone_data(directory, plan_name, tabs_list_file, zones_list_file, out
         # Format: "6 October 2025 at 15:56" (no leading zeros)
         timestamp = current_time.strftime("%-d %B %Y at %H:%M")
 
-    # Open the output file for writing
-    with open(output_filename, 'w') as out_file:
-        sys.stdout = out_file  # Redirect output to the file
+    # Build the HTML in memory and write it out in one go; this keeps the
+    # function reentrant (no sys.stdout swapping) so rooms can run in parallel
+    parts = []
+    append = parts.append
 
-        print(f'''<html>
+    append(f'''<html>
 <head>
 <style>
     :root {{
@@ -74,64 +98,73 @@ def extract_zone_data(directory, plan_name, tabs_list_file, zones_list_file, out
 </head>
 <body>
 ''')
-        
-        print(f"<h1>{plan_name}</h1>")
-
-        # Process each tab
-        for tab in tabs_list:
-            # Find all CSV files that start with the tab name
-            matching_files = [
-                f for f in os.listdir(directory) if f.startswith(tab) and f.endswith(".csv")
-            ]
-            
-            if len(matching_files) == 0:
-                print(f"Error: No CSV files found for tab {tab}.")
-            elif len(matching_files) > 1:
-                print(f"Error: Ambiguous choice of CSV files for tab {tab}. Files found:")
-                for f in matching_files:
-                    print(f"  - {f}")
-            else:
-                tab_filename = os.path.join(directory, matching_files[0])
-                print(f"<h2>{tab}</h2>")
-                
-                with open(tab_filename, 'r') as csvfile:
-                    print('<table>')
-                    reader = csv.reader(csvfile)
-                    
-                    row_zone = ''
-                    # Iterate through each row
-                    for i, row in enumerate(reader):
-                        if row:  # Skip empty rows
-                            # If it's the first row (header), print "true"
-                            if i == 0:
-                                print('<tr><th>' + '</th><th>'.join(cell for cell in row) + '</th></tr>')
-                                #print(f'th,"' + '","'.join(cell.replace('"', '""') for cell in row) + '"')
-                            else:
-                                if row[1] != '':
-                                    row_zone = row[1]            
-                                # Check if the second column matches any zone
-                                if row_zone in zones_list and row[0] !='':
-                                    print(
-                                        unicode_to_html_entities(
-                                            '<tr><td>'
-                                            + '</td><td>'.join(cell for cell in row)
-                                            + '</td></tr>'
-                                        )
-                                    )
-                                    #print(f'td,"'+'","'.join(cell.replace('"', '""') for cell in row) + '"')
-                    print('</table>')
-                    
-        print('''
+
+    append(f"<h1>{plan_name}</h1>")
+
+    # Process each tab
+    for tab in tabs_list:
+        # Find all CSV files that start with the tab name
+        matching_files = [f for f in csv_files if f.startswith(tab)]
+
+        if len(matching_files) == 0:
+            append(f"Error: No CSV files found for tab {tab}.")
+        elif len(matching_files) > 1:
+            append(f"Error: Ambiguous choice of CSV files for tab {tab}. Files found:")
+            for f in matching_files:
+                append(f"  - {f}")
+        else:
+            tab_filename = os.path.join(directory, matching_files[0])
+            append(f"<h2>{tab}</h2>")
+
+            with open(tab_filename, 'r') as csvfile:
+                append('<table>')
+                reader = csv.reader(csvfile)
+
+                # Emit the header row first, then loop over just the data
+                # rows; joining a row directly avoids an identity generator
+                header = next(reader, None)
+                row_fmt = None
+                if header:
+                    append('<tr><th>' + '</th><th>'.join(header) + '</th></tr>')
+                    # Precompute a %-format string for the table's column
+                    # count; a single C-level substitution per row
+                    row_fmt = '<tr><td>' + '</td><td>'.join(['%s'] * len(header)) + '</td></tr>'
+
+                row_zone = ''
+                for row in reader:
+                    if row:  # Skip empty rows
+                        if row[1] != '':
+                            row_zone = _canon(row[1])
+                        # Check if the second column matches any zone
+                        if row_zone in zones_set and row[0] !='':
+                            try:
+                                row_html = row_fmt % tuple(row)
+                            except TypeError:
+                                # Ragged row (or missing header): fall back to join
+                                row_html = '<tr><td>' + '</td><td>'.join(row) + '</td></tr>'
+                            append(unicode_to_html_entities(row_html))
+                append('</table>')
+
+    append('''
 </body>
 </html>
 ''')
-        # Reset sys.stdout after writing to file
-        sys.stdout = sys.__stdout__
+
+    html = '\n'.join(parts)
+
+    # Write the whole document in a single call
+    with open(output_filename, 'w') as out_file:
+        out_file.write(html)
 
     print(f"Data extraction complete. Output written to {output_filename}")
 
+    # Returned so callers can render the PDF without re-reading the file
+    return html
+
 def unicode_to_html_entities(text):
-    return ''.join(f'&#{ord(c)};' if ord(c) > 127 else c for c in text)
+    # The ascii codec's xmlcharrefreplace handler produces the same &#N;
+    # escapes as the old per-character loop, in a single C-level pass.
+    return text.encode('ascii', 'xmlcharrefreplace').decode('ascii')
 
 def main():
     import argparse
@@ -1,6 +1,24 @@
 import sys
 import weasyprint
 
+# Shared font configuration, built on first render. Rebuilding this per call
+# is one of WeasyPrint's most expensive startup steps, and the font set does
+# not change between rooms.
+_font_config = None
+
+
+def _get_font_config():
+    global _font_config
+    if _font_config is None:
+        _font_config = weasyprint.text.fonts.FontConfiguration()
+    return _font_config
+
+
+def html_to_pdf_from_string(html_content, output_filename, base_url=None):
+    """Convert an HTML string to PDF without touching the filesystem."""
+    weasyprint.HTML(string=html_content, base_url=base_url).write_pdf(
+        output_filename, font_config=_get_font_config())
+
 
 def html_to_pdf(input_filename, output_filename):
     """Convert HTML file to PDF."""
@@ -10,7 +28,7 @@ def html_to_pdf(input_filename, output_filename):
     except FileNotFoundError:
         raise FileNotFoundError(f"HTML file not found: {input_filename}")
 
-    weasyprint.HTML(string=html_content).write_pdf(output_filename)
+    html_to_pdf_from_string(html_content, output_filename)
 
 
 def main():
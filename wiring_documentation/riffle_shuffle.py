@@ -4,30 +4,123 @@ import argparse
 import sys
 import os
 import glob
+import fnmatch
+import mmap
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 from pypdf import PdfReader, PdfWriter
 
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
 
-def get_page_counts(input_files):
+
+def _install_objstm_cache():
+    """Memoise pypdf's per-object-stream reads on each reader.
+
+    pypdf re-parses an object stream's index header every time an object is
+    fetched from it; for inputs whose ObjStm holds thousands of entries that
+    rescan dominates the interleave. Wrap _get_object_from_stream so each
+    (idnum, generation) is parsed once per reader and served from a dict
+    afterwards. Guarded so it degrades to a no-op if pypdf's internals ever
+    rename the method; drop this once pypdf caches object-stream offsets
+    upstream.
+    """
+    original = getattr(PdfReader, '_get_object_from_stream', None)
+    if original is None or getattr(original, '_objstm_cached', False):
+        return
+
+    def _cached_get_object_from_stream(self, indirect_reference):
+        cache = getattr(self, '_objstm_object_cache', None)
+        if cache is None:
+            cache = self._objstm_object_cache = {}
+
+        key = (indirect_reference.idnum, indirect_reference.generation)
+        if key not in cache:
+            cache[key] = original(self, indirect_reference)
+        return cache[key]
+
+    _cached_get_object_from_stream._objstm_cached = True
+    PdfReader._get_object_from_stream = _cached_get_object_from_stream
+
+
+_install_objstm_cache()
+
+
+def _count_pages(filename):
+    """Return a PDF's page count without resolving every page object.
+
+    Reads /Root -> /Pages -> /Count from the trailer rather than walking the
+    whole page tree, so validation stays cheap on large inputs. Runs as a
+    process pool worker.
+    """
+    if pikepdf is not None:
+        with pikepdf.Pdf.open(filename) as pdf:
+            return int(pdf.Root.Pages.Count)
+
+    with open(filename, 'rb') as f:
+        return int(PdfReader(f, strict=False).trailer["/Root"]["/Pages"]["/Count"])
+
+
+def get_page_counts(input_files, threads=None):
+    # Parsing is CPU-bound and per-file independent, so count files in
+    # parallel worker processes when there is more than one
     page_counts = {}
-    for filename in input_files:
-        try:
-            with open(filename, 'rb') as f:
-                reader = PdfReader(f)
-                page_counts[filename] = len(reader.pages)
-        except Exception as e:
-            print(f"Error reading {filename}: {e}", file=sys.stderr)
-            return None
-    return page_counts
+
+    if threads is None:
+        threads = os.cpu_count() or 1
+
+    if len(input_files) <= 1 or threads <= 1:
+        for filename in input_files:
+            try:
+                page_counts[filename] = _count_pages(filename)
+            except Exception as e:
+                print(f"Error reading {filename}: {e}", file=sys.stderr)
+                return None
+        return page_counts
+
+    # Consume results as they finish and stop the moment two files disagree:
+    # cancelling the outstanding counts means a misconfigured batch fails as
+    # soon as the mismatch is seen, not after every file has been parsed
+    with ProcessPoolExecutor(max_workers=min(len(input_files), threads)) as executor:
+        futures = {executor.submit(_count_pages, filename): filename for filename in input_files}
+        first_file = None
+        first_count = None
+
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                count = future.result()
+            except Exception as e:
+                print(f"Error reading {filename}: {e}", file=sys.stderr)
+                executor.shutdown(cancel_futures=True)
+                return None
+
+            if first_count is None:
+                first_file, first_count = filename, count
+            elif count != first_count:
+                print(f"Error: {filename} has {count} pages "
+                      f"but {first_file} has {first_count}", file=sys.stderr)
+                executor.shutdown(cancel_futures=True)
+                return None
+
+            page_counts[filename] = count
+
+    # Completion order is nondeterministic; hand back the counts in input
+    # order so diagnostics and any iteration downstream stay stable
+    return {filename: page_counts[filename] for filename in input_files}
 
 
 def validate_page_counts(page_counts):
     if not page_counts:
         return False
 
-    page_count_values = list(page_counts.values())
-    first_count = page_count_values[0]
-
-    if not all(count == first_count for count in page_count_values):
+    # One hashed pass; the per-file diagnostic is only built on mismatch
+    if len(set(page_counts.values())) > 1:
         print("Error: Input files have different numbers of pages:", file=sys.stderr)
         for filename, count in page_counts.items():
             print(f"  {filename}: {count} pages", file=sys.stderr)
@@ -36,8 +129,37 @@ def validate_page_counts(page_counts):
     return True
 
 
-def riffle_shuffle_pdfs(input_files, output_file):
-    page_counts = get_page_counts(input_files)
+def riffle_shuffle_pdfs(input_files, output_file, chunk_pages=0, threads=None):
+    # Fastest first: the qpdf CLI does the whole interleave natively with a
+    # streaming footprint, then pikepdf (QPDF's C++ core in-process), then
+    # pure-Python pypdf. The Python backends open every input exactly once
+    # and share the parsed state between page-count validation and the merge.
+    # threads bounds the parallel page-count phase; the interleave itself
+    # stays single-threaded (neither writer backend is thread-safe), so the
+    # output is byte-identical whatever the setting.
+    qpdf = shutil.which('qpdf')
+    if qpdf:
+        result = _riffle_shuffle_qpdf(qpdf, input_files, output_file, threads)
+        if result is not None:
+            return result
+        # qpdf itself choked on the inputs; the in-process backends parse
+        # more forgivingly (strict=False), so give them a try
+        print("qpdf failed; retrying with in-process backend", file=sys.stderr)
+
+    if pikepdf is not None:
+        return _riffle_shuffle_pikepdf(input_files, output_file)
+
+    return _riffle_shuffle_pypdf(input_files, output_file, chunk_pages)
+
+
+def _riffle_shuffle_qpdf(qpdf, input_files, output_file, threads=None):
+    """Interleave pages by shelling out to the qpdf CLI.
+
+    Returns True on success, False when the inputs fail validation (no point
+    retrying those), and None when qpdf itself fails so the caller can fall
+    back to an in-process backend.
+    """
+    page_counts = get_page_counts(input_files, threads)
 
     if page_counts is None:
         return False
@@ -45,49 +167,298 @@ def riffle_shuffle_pdfs(input_files, output_file):
     if not validate_page_counts(page_counts):
         return False
 
-    num_pages = list(page_counts.values())[0]
+    num_pages = next(iter(page_counts.values()))
 
-    writer = PdfWriter()
+    # qpdf page selection is "file page file page ..." (1-based)
+    page_args = []
+    for page_num in range(num_pages):
+        for filename in input_files:
+            page_args.append(filename)
+            page_args.append(str(page_num + 1))
+
+    # --object-streams=generate packs the (heavily duplicated) page-level
+    # objects into compressed object streams, shrinking the output
+    argv = [qpdf, '--empty', '--object-streams=generate', '--pages'] + page_args + ['--', output_file]
 
+    args_file = None
     try:
-        file_handles = []
-        readers = []
+        if sum(len(arg) + 1 for arg in argv) > 32000:
+            # Long interleaves overflow the argv limit; use qpdf's @argfile
+            # syntax (one argument per line) instead
+            with tempfile.NamedTemporaryFile('w', suffix='.args', delete=False) as f:
+                args_file = f.name
+                f.write('\n'.join(argv[1:]))
+            argv = [qpdf, f'@{args_file}']
+
+        # Exit code 3 means warnings only (e.g. a recovered xref): the
+        # output was still written, so treat it as success
+        returncode = subprocess.run(argv).returncode
+        if returncode in (0, 3):
+            return True
+
+        print(f"Error processing files: qpdf exited with code {returncode}",
+              file=sys.stderr)
+        return None
+
+    except OSError as e:
+        print(f"Error processing files: {e}", file=sys.stderr)
+        return None
+
+    finally:
+        if args_file is not None:
+            os.unlink(args_file)
 
+
+def _riffle_shuffle_pikepdf(input_files, output_file):
+    """Interleave pages with pikepdf; parsing and page copies run in QPDF C++.
+
+    out.pages.append copies pages by indirect reference only: content streams
+    pass through to the output untouched, never decompressed or re-encoded.
+    """
+    sources = []
+
+    try:
         for filename in input_files:
-            f = open(filename, 'rb')
-            file_handles.append(f)
-            readers.append(PdfReader(f))
+            sources.append(pikepdf.Pdf.open(filename, access_mode=pikepdf.AccessMode.mmap))
 
-        for page_num in range(num_pages):
-            for reader in readers:
-                writer.add_page(reader.pages[page_num])
+        # Validate counts from the already-open files
+        page_counts = {
+            filename: int(src.Root.Pages.Count)
+            for filename, src in zip(input_files, sources)
+        }
+        if not validate_page_counts(page_counts):
+            return False
 
-        with open(output_file, 'wb') as output:
-            writer.write(output)
+        num_pages = next(iter(page_counts.values()))
 
-        for f in file_handles:
-            f.close()
+        with pikepdf.Pdf.new() as out:
+            for page_num in range(num_pages):
+                for src in sources:
+                    out.pages.append(src.pages[page_num])
+
+            out.save(output_file,
+                     object_stream_mode=pikepdf.ObjectStreamMode.generate)
 
         return True
 
     except Exception as e:
         print(f"Error processing files: {e}", file=sys.stderr)
-        for f in file_handles:
-            if not f.closed:
-                f.close()
+        return False
+
+    finally:
+        for src in sources:
+            src.close()
+
+
+def _prefetch_pages(reader, start, stop):
+    """Warm a reader's resolved-object cache for rounds [start, stop).
+
+    get_page resolves exactly one page's indirect ref per call (no walk of
+    the full page tree) and pulls it through the reader's cache, so the
+    later merge finds the objects already resolved. Runs on a background
+    thread, but only ever for a reader the main thread is not yet merging
+    from (pypdf readers share one seekable stream, so a single reader must
+    not be used from two threads at once).
+    """
+    for page_num in range(start, stop):
+        reader.get_page(page_num)
+
+
+def _interleave_rounds(writer, readers, start, stop):
+    """Interleave rounds [start, stop) of each reader into an empty writer.
+
+    Works file-major rather than round-major: the first file's pages go in
+    with one batched append, and each later file's pages are merged at their
+    interleaved positions. Strict riffle order leaves no contiguous runs to
+    batch for the later files, but grouping all copies from one reader
+    together lets pypdf reuse that reader's resolved-object cache and shared
+    resources between calls.
+
+    While the writer is busy with one reader, a single helper thread parses
+    the next reader's pages ahead of it, overlapping the read/parse phase
+    with the write phase.
+    """
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        prefetch = None
+        if len(readers) > 1:
+            prefetch = prefetcher.submit(_prefetch_pages, readers[1], start, stop)
+
+        writer.append(readers[0], pages=list(range(start, stop)))
+
+        for file_idx, reader in enumerate(readers[1:], start=1):
+            # Wait until this reader's prefetch is done before merging from
+            # it, then start parsing the next reader in the background
+            if prefetch is not None:
+                prefetch.result()
+            if file_idx + 1 < len(readers):
+                prefetch = prefetcher.submit(
+                    _prefetch_pages, readers[file_idx + 1], start, stop)
+            else:
+                prefetch = None
+
+            for page_num in range(start, stop):
+                # With file_idx earlier files interleaved, page page_num of
+                # this file lands at (page_num - start) * (file_idx + 1) + file_idx
+                writer.merge((page_num - start) * (file_idx + 1) + file_idx,
+                             reader, pages=(page_num, page_num + 1))
+
+
+def _write_pdf(writer, output_path):
+    """Serialize a writer through a 1 MiB buffer with a sequential-write hint.
+
+    The default 8 KiB buffer turns a multi-hundred-MB serialization into many
+    small kernel writes.
+
+    pypdf cannot emit compressed object streams, so output from this path is
+    larger than the qpdf/pikepdf backends produce; this writer only runs when
+    both of those are unavailable, so there is nothing here to repack with.
+    """
+    with open(output_path, 'wb', buffering=1 << 20) as output:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(output.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        writer.write(output)
+
+
+def _concatenate_pdfs(chunk_files, output_file):
+    """Concatenate already-interleaved chunk PDFs into the final output."""
+    qpdf = shutil.which('qpdf')
+    if qpdf:
+        # qpdf streams the concatenation without holding every page in
+        # memory, and regenerates compressed object streams on the way out.
+        # As in _riffle_shuffle_qpdf, exit code 3 is warnings only (output
+        # still written); on a real failure fall through to pypdf below
+        try:
+            returncode = subprocess.run(
+                [qpdf, '--empty', '--object-streams=generate', '--pages']
+                + chunk_files + ['--', output_file]).returncode
+        except OSError:
+            returncode = -1
+        if returncode in (0, 3):
+            return True
+        print("qpdf failed to concatenate chunks; retrying with pypdf",
+              file=sys.stderr)
+
+    # Fallback: re-append the chunks with pypdf. Peak memory matches the
+    # unchunked path, but the output is still correct without qpdf installed
+    writer = PdfWriter()
+    for chunk_path in chunk_files:
+        writer.append(chunk_path)
+
+    _write_pdf(writer, output_file)
+
+    return True
+
+
+def _write_interleaved_chunks(readers, output_file, num_pages, chunk_pages):
+    """Flush the interleave in chunk_pages-round chunks to bound peak memory."""
+    with tempfile.TemporaryDirectory(prefix='riffle_chunks_') as tmp_dir:
+        chunk_files = []
+
+        for start in range(0, num_pages, chunk_pages):
+            stop = min(start + chunk_pages, num_pages)
+
+            # A fresh writer per chunk keeps the working set at
+            # O(chunk_pages x files) instead of O(total pages)
+            chunk_writer = PdfWriter()
+            _interleave_rounds(chunk_writer, readers, start, stop)
+
+            chunk_path = os.path.join(tmp_dir, f"chunk_{len(chunk_files):04d}.pdf")
+            _write_pdf(chunk_writer, chunk_path)
+            chunk_files.append(chunk_path)
+
+        return _concatenate_pdfs(chunk_files, output_file)
+
+
+def _riffle_shuffle_pypdf(input_files, output_file, chunk_pages=0):
+    """Interleave pages with pypdf (fallback when pikepdf is missing).
+
+    Pure interleaving never modifies page content, so pages go through
+    append/merge, which clone the raw (still-compressed) stream objects;
+    nothing here should ever force a content stream to be decoded.
+    """
+    try:
+        # ExitStack owns every file handle and mmap, so cleanup is correct
+        # on all paths (the old manual close loop referenced file_handles
+        # before it existed if the very first open() failed)
+        with ExitStack() as stack:
+            readers = []
+
+            for filename in input_files:
+                f = stack.enter_context(open(filename, 'rb'))
+                # Memory-map the input so pypdf's random xref/object seeks hit
+                # the page cache instead of issuing many small read() syscalls;
+                # mmap objects support the read/seek interface PdfReader needs
+                mm = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_RANDOM)
+                readers.append(PdfReader(mm, strict=False))
+
+            # Validate counts from the already-open readers (trailer /Count,
+            # so no page-tree walk); the same readers then feed the merge
+            page_counts = {
+                filename: int(reader.trailer["/Root"]["/Pages"]["/Count"])
+                for filename, reader in zip(input_files, readers)
+            }
+            if not validate_page_counts(page_counts):
+                return False
+
+            num_pages = next(iter(page_counts.values()))
+
+            if chunk_pages and num_pages > chunk_pages:
+                # Opt-in (--chunk-pages): only bounds peak memory when qpdf
+                # is on PATH to stream the final concatenation
+                return _write_interleaved_chunks(readers, output_file, num_pages, chunk_pages)
+
+            writer = PdfWriter()
+            _interleave_rounds(writer, readers, 0, num_pages)
+            _write_pdf(writer, output_file)
+
+            return True
+
+    except Exception as e:
+        print(f"Error processing files: {e}", file=sys.stderr)
         return False
 
 
 def expand_wildcards(patterns):
+    """Expand wildcard patterns and validate plain filenames in one pass.
+
+    Returns the expanded file list, or None if a plain filename is missing.
+    Wildcard matches come straight from a directory scan, so they need no
+    separate existence check.
+    """
     expanded = []
     for pattern in patterns:
         if '*' in pattern or '?' in pattern:
-            matches = glob.glob(pattern)
+            directory, name_pattern = os.path.split(pattern)
+
+            if '*' in directory or '?' in directory:
+                # Wildcard in a directory component: let glob handle it
+                matches = glob.glob(pattern)
+            else:
+                # One scandir pass classifies and validates; DirEntry.is_file
+                # reuses the stat data from the directory read. Skip dotfiles
+                # (e.g. macOS ._ sidecars) to keep glob's hidden-file
+                # semantics, which fnmatch alone does not have
+                try:
+                    with os.scandir(directory or '.') as entries:
+                        names = [e.name for e in entries
+                                 if e.is_file() and not e.name.startswith('.')]
+                except FileNotFoundError:
+                    names = []
+                matches = [os.path.join(directory, name) if directory else name
+                           for name in fnmatch.filter(names, name_pattern)]
+
             if matches:
                 expanded.extend(sorted(matches))
             else:
                 print(f"Warning: No files match pattern '{pattern}'", file=sys.stderr)
         else:
+            # Plain filename: a single stat replaces the old per-file
+            # exists() pass in main
+            if not os.path.isfile(pattern):
+                print(f"Error: File does not exist: {pattern}", file=sys.stderr)
+                return None
             expanded.append(pattern)
     return expanded
 
@@ -103,20 +474,25 @@ def main():
     parser.add_argument('-o', '--output', required=True,
                        help='Output PDF file')
 
+    parser.add_argument('--chunk-pages', type=int, default=0,
+                       help='Flush output every N interleaved rounds to bound memory; '
+                            'needs qpdf on PATH to help (default: 0, disabled)')
+
+    parser.add_argument('-j', '--threads', type=int, default=os.cpu_count(),
+                       help='Workers for the page-count phase (default: CPU count)')
+
     args = parser.parse_args()
 
     input_files = expand_wildcards(args.input_files)
 
+    if input_files is None:
+        sys.exit(1)
+
     if not input_files:
         print("Error: No input files provided", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        if not os.path.exists(filename):
-            print(f"Error: File does not exist: {filename}", file=sys.stderr)
-            sys.exit(1)
-
-    success = riffle_shuffle_pdfs(input_files, args.output)
+    success = riffle_shuffle_pdfs(input_files, args.output, args.chunk_pages, args.threads)
 
     if not success:
         sys.exit(1)